@@ -5,17 +5,155 @@ Makes continuous requests to Tinder's recommendations API until a non-200 respon
 Stores all collected users in a CSV file.
 """
 
+import asyncio
+import collections
 import json
-import csv
+import os
+import queue
+import threading
 import time
-from datetime import datetime
-from curl_cffi import requests
+from datetime import date, datetime, timezone
+from curl_cffi import CurlHttpVersion, requests
+
+try:
+    # orjson's JSONDecodeError subclasses json.JSONDecodeError, so the handlers below cover both
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Errors raised while decoding a recs payload, whichever parser is in use
+JSON_DECODE_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+USER_AGENT = 'Tinder/16.14.0 (iPhone; iOS 18.5; Scale/3.00)'
+# Sent on every request; the auth token is added per scraper
+BASE_HEADERS = {'User-Agent': USER_AGENT, 'Accept': 'application/json'}
+RECS_URL = "https://api.gotinder.com/v2/recs/core"
+PROFILE_URL = "https://api.gotinder.com/v2/profile/user"
+META_URL = "https://api.gotinder.com/v2/meta"
+RECS_PARAMS = {'locale': 'en-GB'}
+
+# Written in the age column when the birth date is missing or unparseable
+AGE_NA = 'N/A'
+
+# Flattens bios onto a single CSV line in one pass
+BIO_TRANS = str.maketrans({'\n': ' ', '\r': ' '})
+
+# Statuses worth waiting out rather than aborting the scrape
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_BACKOFF = 60.0
+# Returned in place of a status code when a recs request should simply be retried
+RETRY = 'RETRY'
+
+# The only user fields extract_users_from_response reads (besides photo URLs)
+RECS_USER_FIELDS = ('_id', 'name', 'bio', 'birth_date')
+_USER_PREFIX = 'data.results.item.user.'
+
+def _parse_recs_streaming(content):
+    """Parse a recs/core payload with ijson, keeping only the fields the scraper uses.
+    
+    Returns the same shape as a full decode, minus every unused attribute.
+    """
+    results = []
+    result = None
+    for prefix, event, value in ijson.parse(content):
+        if prefix == 'data.results.item':
+            if event == 'start_map':
+                result = {'user': {'photos': []}}
+            elif event == 'end_map':
+                results.append(result)
+        elif prefix == 'data.results.item.type':
+            result['type'] = value
+        elif prefix == 'data.results.item.user.photos.item':
+            if event == 'start_map':
+                result['user']['photos'].append({})
+        elif prefix == 'data.results.item.user.photos.item.url':
+            result['user']['photos'][-1]['url'] = value
+        elif prefix.startswith(_USER_PREFIX) and prefix[len(_USER_PREFIX):] in RECS_USER_FIELDS:
+            result['user'][prefix[len(_USER_PREFIX):]] = value
+    return {'data': {'results': results}}
+
+def _header_seconds(headers, name):
+    """Read a rate-limit header as a number of seconds from now, or None if absent/invalid."""
+    value = headers.get(name)
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    # X-RateLimit-Reset may be an absolute epoch timestamp rather than a delta
+    if seconds > 1e9:
+        seconds -= time.time()
+    return seconds
+
+def _csv_escape(value):
+    """Quote a CSV field only if it contains a delimiter, quote or newline."""
+    if '"' in value or ',' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+class TokenBucket:
+    """Rate limiter allowing bursts of `burst` requests, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate=5.0, burst=10):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate = rate
+        # The configured rate is a ceiling; server headers may only lower `rate` below it
+        self.max_rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def _take(self):
+        """Take a token and return 0, or return the seconds until one is available."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available."""
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a token is available."""
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
 
 class TinderScraper:
-    def __init__(self, auth_token):
+    def __init__(self, auth_token, stream_json=False, flush_every_n_batches=1, fsync=False):
+        if stream_json and ijson is None:
+            raise ImportError("stream_json=True requires the 'ijson' package")
         self.auth_token = auth_token
-        self.users_collected = []
+        # Decode recs pages with ijson, keeping only the fields we need, instead of a full decode
+        self.stream_json = stream_json
+        # Flush the CSV buffer every N batches; fsync additionally forces the data to disk
+        self._flush_every_n_batches = flush_every_n_batches
+        self._fsync = fsync
+        self._batches_since_flush = 0
+        self.session_headers = {**BASE_HEADERS, 'X-Auth-Token': auth_token}
+        self.session = requests.Session(impersonate="chrome110")
+        self.session.headers.update(self.session_headers)
+        # Only the last few users are kept in memory, for the summary sample
+        self.recent_users = collections.deque(maxlen=5)
+        self.total_user_count = 0
+        self.seen_ids = set()
         self.request_count = 0
+        self._backoff = 1.0
+        self._bucket = None
+        self._today = datetime.now(timezone.utc).date()
         self.csv_filename = f"tinder_users_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         # CSV headers
@@ -24,216 +162,468 @@ class TinderScraper:
             'photo_count', 'photo_urls'
         ]
         
-        # Initialize CSV file
-        self.init_csv()
-
-    def init_csv(self):
-        """Initialize CSV file with headers"""
-        with open(self.csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(self.csv_headers)
+        # Keep the CSV file open for the whole session; binary mode skips the text encoding layer
+        self._csv_fh = open(self.csv_filename, 'wb', buffering=1 << 20)
+        self._csv_fh.write((','.join(self.csv_headers) + '\n').encode('utf-8'))
         print(f"Initialized CSV file: {self.csv_filename}")
 
+    def close(self):
+        """Close the underlying HTTP session and the CSV file."""
+        self.session.close()
+        if not self._csv_fh.closed:
+            # Batches written since the last checkpoint get the same durability as the rest
+            if self._batches_since_flush:
+                self._checkpoint_csv()
+            self._csv_fh.close()
+
+    def _async_session(self, max_clients=10):
+        """Create an AsyncSession that multiplexes concurrent requests over one HTTP/2 connection."""
+        return requests.AsyncSession(
+            impersonate="chrome110",
+            headers=self.session_headers,
+            http_version=CurlHttpVersion.V2_0,
+            max_clients=max(max_clients, 10),
+        )
+
     def calculate_age(self, birth_date_str):
         """Calculate age from birth date string"""
+        if not isinstance(birth_date_str, str) or len(birth_date_str) < 10:
+            return AGE_NA
+        
+        # Tinder returns ISO-8601 timestamps ("1999-04-12T00:00:00.000Z"); only the date part matters
         try:
-            if not birth_date_str or birth_date_str == 'N/A':
-                return 'N/A'
-            
-            birth_date = datetime.fromisoformat(birth_date_str.replace('Z', '+00:00'))
-            today = datetime.now()
-            age = today.year - birth_date.year
-            
-            # Adjust if birthday hasn't occurred this year
-            if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-                age -= 1
-                
-            return age
-        except:
-            return 'N/A'
+            birth_date = date.fromisoformat(birth_date_str[:10])
+        except ValueError:
+            return AGE_NA
+        
+        today = self._today
+        # Subtract one if the birthday hasn't occurred yet this year
+        return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
-    def _make_profile_update_request(self, data, action_name):
-        """Generic method to update user profile settings."""
-        print(f"Updating {action_name}...")
-        url = "https://api.gotinder.com/v2/profile/user"
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Auth-Token': self.auth_token,
-            'User-Agent': 'Tinder/16.14.0 (iPhone; iOS 18.5; Scale/3.00)'
+    def _location_update(self, lat, lon):
+        """Build the (url, data, action_name) of a location update."""
+        data = {"force_fetch_resources": True, "background": False, "lat": lat, "lon": lon}
+        return META_URL, data, f"location to: lat={lat}, lon={lon}"
+
+    def _distance_filter_update(self, distance_km):
+        """Build the (url, data, action_name) of a distance filter update."""
+        distance_miles = distance_km / 1.60934
+        data = {"distance_filter": distance_miles}
+        return PROFILE_URL, data, f"distance filter to {distance_km} km ({distance_miles:.2f} miles)"
+
+    def _gender_interest_update(self, gender_code):
+        """Build the (url, data, action_name) of a gender interest update, or None if the code is invalid."""
+        gender_map = {0: "Men", 1: "Women"}
+        if gender_code not in gender_map:
+            print(f"✗ Invalid gender code: {gender_code}. Use 0 for Men, 1 for Women.")
+            return None
+        data = {"interested_in_genders": [gender_code]}
+        return PROFILE_URL, data, f"gender interest to {gender_map[gender_code]}"
+
+    def _age_filter_update(self, min_age, max_age, auto_expand=True):
+        """Build the (url, data, action_name) of an age filter update."""
+        data = {
+            "age_filter_min": min_age,
+            "age_filter_max": max_age,
+            "auto_expansion": {"age_toggle": auto_expand}
         }
+        return PROFILE_URL, data, f"age filter to {min_age}-{max_age}"
+
+    def _report_profile_update(self, response, action_name):
+        """Print the outcome of a profile update response."""
+        if response.status_code == 200:
+            print(f"✓ Successfully updated {action_name}.")
+        else:
+            print(f"✗ Failed to update {action_name}. Status: {response.status_code}")
+            print(f"  Response: {response.text}")
+
+    def _make_profile_update_request(self, update):
+        """Generic method to update user profile settings on the persistent session."""
+        if update is None:
+            return
+        url, data, action_name = update
+        print(f"Updating {action_name}...")
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30, impersonate="chrome110")
-            if response.status_code == 200:
-                print(f"✓ Successfully updated {action_name}.")
-            else:
-                print(f"✗ Failed to update {action_name}. Status: {response.status_code}")
-                print(f"  Response: {response.text}")
+            response = self.session.post(url, json=data, timeout=30)
+            self._report_profile_update(response, action_name)
         except requests.exceptions.RequestException as e:
             print(f"✗ Request to update {action_name} failed: {e}")
-        except json.JSONDecodeError as e:
-            print(f"✗ Failed to parse JSON response from {action_name} update: {e}")
 
-    def update_location(self, lat, lon):
-        """Update the user's location."""
-        print(f"Updating location to: lat={lat}, lon={lon}...")
-        url = "https://api.gotinder.com/v2/meta"
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Auth-Token': self.auth_token,
-            'User-Agent': 'Tinder/16.14.0 (iPhone; iOS 18.5; Scale/3.00)'
-        }
-        data = {"force_fetch_resources": True, "background": False, "lat": lat, "lon": lon}
+    async def _make_profile_update_request_async(self, session, update):
+        """Async variant of _make_profile_update_request on an AsyncSession."""
+        if update is None:
+            return
+        url, data, action_name = update
+        print(f"Updating {action_name}...")
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30, impersonate="chrome110")
-            if response.status_code == 200:
-                print("✓ Successfully updated location.")
-            else:
-                print(f"✗ Failed to update location. Status: {response.status_code}")
-                print(f"  Response: {response.text}")
+            response = await session.post(url, json=data, timeout=30)
+            self._report_profile_update(response, action_name)
         except requests.exceptions.RequestException as e:
-            print(f"✗ Request to update location failed: {e}")
-        except json.JSONDecodeError as e:
-            print(f"✗ Failed to parse JSON response from location update: {e}")
+            print(f"✗ Request to update {action_name} failed: {e}")
+
+    def update_location(self, lat, lon):
+        """Update the user's location."""
+        self._make_profile_update_request(self._location_update(lat, lon))
 
     def update_distance_filter(self, distance_km):
         """Update the user's distance filter."""
-        distance_miles = distance_km / 1.60934
-        data = {"distance_filter": distance_miles}
-        self._make_profile_update_request(data, f"distance filter to {distance_km} km ({distance_miles:.2f} miles)")
+        self._make_profile_update_request(self._distance_filter_update(distance_km))
 
     def update_gender_interest(self, gender_code):
         """Update the gender interest for recommendations."""
-        gender_map = {0: "Men", 1: "Women"}
-        if gender_code not in gender_map:
-            print(f"✗ Invalid gender code: {gender_code}. Use 0 for Men, 1 for Women.")
-            return
-        data = {"interested_in_genders": [gender_code]}
-        self._make_profile_update_request(data, f"gender interest to {gender_map[gender_code]}")
+        self._make_profile_update_request(self._gender_interest_update(gender_code))
 
     def update_age_filter(self, min_age, max_age, auto_expand=True):
         """Update the age filter for recommendations."""
-        data = {
-            "age_filter_min": min_age,
-            "age_filter_max": max_age,
-            "auto_expansion": {"age_toggle": auto_expand}
-        }
-        self._make_profile_update_request(data, f"age filter to {min_age}-{max_age}")
+        self._make_profile_update_request(self._age_filter_update(min_age, max_age, auto_expand))
+
+    async def update_location_async(self, session, lat, lon):
+        """Async variant of update_location."""
+        await self._make_profile_update_request_async(session, self._location_update(lat, lon))
+
+    async def update_distance_filter_async(self, session, distance_km):
+        """Async variant of update_distance_filter."""
+        await self._make_profile_update_request_async(session, self._distance_filter_update(distance_km))
+
+    async def update_gender_interest_async(self, session, gender_code):
+        """Async variant of update_gender_interest."""
+        await self._make_profile_update_request_async(session, self._gender_interest_update(gender_code))
+
+    async def update_age_filter_async(self, session, min_age, max_age, auto_expand=True):
+        """Async variant of update_age_filter."""
+        await self._make_profile_update_request_async(session, self._age_filter_update(min_age, max_age, auto_expand))
 
+    async def update_profile_settings_async(self, lat, lon, min_age, max_age, distance_km, gender_code):
+        """Send all profile setting updates concurrently."""
+        async with self._async_session() as session:
+            await asyncio.gather(
+                self.update_location_async(session, lat, lon),
+                self.update_age_filter_async(session, min_age, max_age),
+                self.update_distance_filter_async(session, distance_km),
+                self.update_gender_interest_async(session, gender_code),
+            )
+
+    def _next_retry_delay(self, response):
+        """Return how long to wait before retrying, honoring rate-limit headers, and grow the backoff."""
+        retry_after = max(
+            _header_seconds(response.headers, 'Retry-After') or 0,
+            _header_seconds(response.headers, 'X-RateLimit-Reset') or 0,
+        )
+        
+        delay = max(retry_after, self._backoff)
+        self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+        return delay
+
+    def _retune_bucket(self, response):
+        """Slow the token bucket to the server's remaining request budget, if advertised."""
+        if self._bucket is None:
+            return
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_secs = _header_seconds(response.headers, 'X-RateLimit-Reset')
+        if remaining is None or reset_secs is None:
+            return
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        # Keep a trickle of one request per window so an exhausted budget doesn't stall forever
+        self._bucket.rate = min(self._bucket.max_rate, max(remaining, 1) / max(reset_secs, 1))
+
+    def _decode_recs(self, content):
+        """Decode a recs/core response body."""
+        if self.stream_json:
+            return _parse_recs_streaming(content)
+        return json_loads(content)
 
     def make_recs_request(self):
         """Make a single request to the Tinder recommendations API."""
-        url = "https://api.gotinder.com/v2/recs/core"
-        params = {'locale': 'en-GB'}
-        headers = {
-            'X-Auth-Token': self.auth_token,
-            'User-Agent': 'Tinder/16.14.0 (iPhone; iOS 18.5; Scale/3.00)',
-            'Accept': 'application/json'
-        }
-        
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=30, impersonate="chrome110")
-            return response.status_code, response.json() if response.status_code == 200 else response.text
+            response = self.session.get(RECS_URL, params=RECS_PARAMS, timeout=30)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                delay = self._next_retry_delay(response)
+                print(f"Got {response.status_code}, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                return RETRY, response.text
+            if response.status_code == 200:
+                self._backoff = 1.0
+                self._retune_bucket(response)
+            return response.status_code, self._decode_recs(response.content) if response.status_code == 200 else response.text
         except requests.exceptions.RequestException as e:
             print(f"Request failed: {e}")
             return None, str(e)
-        except json.JSONDecodeError as e:
+        except JSON_DECODE_ERRORS as e:
+            print(f"Failed to parse JSON: {e}")
+            return response.status_code, response.text
+
+    async def _make_recs_request_async(self, session):
+        """Make a single request to the Tinder recommendations API on an AsyncSession."""
+        try:
+            response = await session.get(RECS_URL, params=RECS_PARAMS, timeout=30)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                delay = self._next_retry_delay(response)
+                print(f"Got {response.status_code}, retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                return RETRY, response.text
+            if response.status_code == 200:
+                self._backoff = 1.0
+                self._retune_bucket(response)
+            return response.status_code, self._decode_recs(response.content) if response.status_code == 200 else response.text
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {e}")
+            return None, str(e)
+        except JSON_DECODE_ERRORS as e:
             print(f"Failed to parse JSON: {e}")
             return response.status_code, response.text
 
     def extract_users_from_response(self, data):
-        """Extract users from API response and add to the collection."""
+        """Extract new users from an API response and return them as a list."""
+        self._today = datetime.now(timezone.utc).date()
         if 'data' not in data or 'results' not in data['data']:
-            return 0
+            return []
         
-        users_found = 0
+        new_users = []
+        seen_ids = self.seen_ids
         for result in data['data']['results']:
             if result.get('type') != 'user':
                 continue
             
-            user = result.get('user', {})
-            user_id = user.get('_id')
+            user_get = result.get('user', {}).get
+            user_id = user_get('_id')
             
-            if not user_id or any(u['user_id'] == user_id for u in self.users_collected):
+            if not user_id or user_id in seen_ids:
                 continue
             
-            photos = user.get('photos', [])
-            photo_urls = [p.get('url') for p in photos if p.get('url')]
+            photos = user_get('photos', [])
+            photo_urls = [url for p in photos if (url := p.get('url'))]
+            birth_date = user_get('birth_date') or ''
             
             user_data = {
                 'user_id': user_id,
-                'name': user.get('name', ''),
-                'age': self.calculate_age(user.get('birth_date', '')),
-                'bio': (user.get('bio') or '').replace('\n', ' ').replace('\r', ' '),
-                'birth_date': user.get('birth_date', ''),
+                'name': user_get('name') or '',
+                'age': self.calculate_age(birth_date),
+                'bio': (user_get('bio') or '').translate(BIO_TRANS),
+                'birth_date': birth_date,
                 'photo_count': len(photos),
                 'photo_urls': ' | '.join(photo_urls),
             }
             
-            self.users_collected.append(user_data)
-            users_found += 1
+            new_users.append(user_data)
+            seen_ids.add(user_id)
         
-        return users_found
+        self.total_user_count += len(new_users)
+        self.recent_users.extend(new_users)
+        return new_users
 
     def save_users_to_csv(self, new_users_data):
         """Append new users to the CSV file."""
         if not new_users_data:
             return
         
-        with open(self.csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=self.csv_headers)
-            writer.writerows(new_users_data)
+        # Format the whole batch ourselves; only free-text fields can need quoting
+        rows = [
+            f"{u['user_id']},{_csv_escape(u['name'])},{u['age']},{_csv_escape(u['bio'])},"
+            f"{u['birth_date']},{u['photo_count']},{_csv_escape(u['photo_urls'])}\n"
+            for u in new_users_data
+        ]
+        # One encode and one write per batch
+        self._csv_fh.write(''.join(rows).encode('utf-8'))
+        
+        self._batches_since_flush += 1
+        if self._batches_since_flush >= self._flush_every_n_batches:
+            self._checkpoint_csv()
+
+    def _checkpoint_csv(self):
+        """Flush buffered CSV rows, and fsync them if requested."""
+        self._csv_fh.flush()
+        if self._fsync:
+            os.fsync(self._csv_fh.fileno())
+        self._batches_since_flush = 0
     
-    def run_continuous_scraping(self, delay_between_requests=2, max_requests=None):
-        """Run continuous scraping until a non-200 response or limit is reached."""
+    def _writer_loop(self):
+        """Write batches from the write queue to the CSV file until a None sentinel arrives."""
+        try:
+            while True:
+                batch = self._write_queue.get()
+                if batch is None:
+                    break
+                self.save_users_to_csv(batch)
+        except Exception as e:
+            # Surfaced to the scraping loop by _enqueue_batch / run_continuous_scraping
+            self._writer_error = e
+
+    def _check_writer(self):
+        """Re-raise a failure from the CSV writer thread in the scraping loop."""
+        if self._writer_error is not None:
+            raise self._writer_error
+        if not self._writer_thread.is_alive():
+            raise RuntimeError("CSV writer thread stopped unexpectedly")
+
+    def _enqueue_batch(self, batch):
+        """Hand a batch to the writer thread without blocking forever if it has died."""
+        while True:
+            self._check_writer()
+            try:
+                self._write_queue.put(batch, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _stop_writer(self):
+        """Send the shutdown sentinel to the writer thread, if it is still running, and wait for it."""
+        while self._writer_thread.is_alive():
+            try:
+                self._write_queue.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self._writer_thread.join()
+
+    def run_continuous_scraping(self, rate=5.0, burst=10, max_requests=None, concurrency=1):
+        """Run continuous scraping until a non-200 response or limit is reached.
+        
+        Requests are paced by a token bucket of `rate` requests per second with bursts of up
+        to `burst`; pass rate=1/delay, burst=1 for a fixed delay between requests.
+        """
+        if concurrency > 1:
+            try:
+                asyncio.run(self.run_continuous_scraping_async(concurrency, rate, burst, max_requests))
+            except KeyboardInterrupt:
+                print("\n\nScraping interrupted by user (Ctrl+C).")
+            finally:
+                self.close()
+                self.print_summary()
+            return
+        
         print("\n" + "-" * 60)
         print("Starting continuous Tinder scraping...")
-        print(f"Delay between requests: {delay_between_requests} seconds")
+        print(f"Rate limit: {rate} requests/second (burst {burst})")
         print("-" * 60)
         
+        self._bucket = TokenBucket(rate, burst)
+        
+        # CSV writes happen on a background thread so the next request can go out immediately
+        self._write_queue = queue.Queue(maxsize=8)
+        self._writer_error = None
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        
         try:
             while not max_requests or self.request_count < max_requests:
                 self.request_count += 1
                 print(f"Request #{self.request_count}...", end=" ", flush=True)
                 
+                self._bucket.acquire()
                 status_code, response_data = self.make_recs_request()
                 
+                if status_code == RETRY:
+                    continue
+                
                 if status_code != 200:
                     print(f"Non-200 response: {status_code}")
                     print(f"Response: {response_data}")
                     break
                 
-                initial_user_count = len(self.users_collected)
-                new_users_count = self.extract_users_from_response(response_data)
+                new_users = self.extract_users_from_response(response_data)
                 
-                if new_users_count > 0:
-                    new_batch = self.users_collected[initial_user_count:]
-                    self.save_users_to_csv(new_batch)
-                    print(f"✓ Found {new_users_count} new users (Total: {len(self.users_collected)})")
+                if new_users:
+                    self._enqueue_batch(new_users)
+                    print(f"✓ Found {len(new_users)} new users (Total: {self.total_user_count})")
                 else:
                     print("✓ No new users found")
                     break
-                
-                time.sleep(delay_between_requests)
                     
         except KeyboardInterrupt:
             print("\n\nScraping interrupted by user (Ctrl+C).")
         
         finally:
-            print("\n" + "="*60)
-            print("SCRAPING SUMMARY")
-            print("="*60)
-            print(f"Total requests made: {self.request_count}")
-            print(f"Total unique users collected: {len(self.users_collected)}")
-            print(f"CSV file saved at: {self.csv_filename}")
-            
-            if self.users_collected:
-                print("\nSample of collected users:")
-                for i, user in enumerate(self.users_collected[:5]):
-                    print(f"  {i+1}. {user['name']} (ID: {user['user_id'][:8]}...) - Age: {user['age']} - {user['photo_count']} photos")
-                if len(self.users_collected) > 5:
-                    print(f"  ... and {len(self.users_collected) - 5} more users")
+            self._stop_writer()
+            self.close()
+            self.print_summary()
+        
+        # A write that failed after the last batch was queued
+        if self._writer_error is not None:
+            raise self._writer_error
+
+    async def run_continuous_scraping_async(self, concurrency=8, rate=5.0, burst=10, max_requests=None):
+        """Run `concurrency` request workers feeding a single CSV writer task."""
+        print("\n" + "-" * 60)
+        print(f"Starting continuous Tinder scraping with {concurrency} workers...")
+        print(f"Rate limit: {rate} requests/second (burst {burst}) shared by all workers")
+        print("-" * 60)
+        
+        self._bucket = TokenBucket(rate, burst)
+        
+        sem = asyncio.BoundedSemaphore(concurrency)
+        response_queue = asyncio.Queue()
+        stop = asyncio.Event()
+        
+        async def worker(session):
+            while not stop.is_set() and (not max_requests or self.request_count < max_requests):
+                self.request_count += 1
+                request_number = self.request_count
+                await self._bucket.acquire_async()
+                async with sem:
+                    status_code, response_data = await self._make_recs_request_async(session)
+                
+                if status_code == RETRY:
+                    continue
+                
+                if status_code != 200:
+                    print(f"Request #{request_number}: Non-200 response: {status_code}")
+                    print(f"Response: {response_data}")
+                    stop.set()
+                    break
+                
+                await response_queue.put((request_number, response_data))
+                # Let the writer run (and possibly set stop) even if nothing above suspended
+                await asyncio.sleep(0)
+        
+        async def writer():
+            # Single consumer: only this task touches seen_ids and the CSV file
+            while True:
+                item = await response_queue.get()
+                if item is None:
+                    break
+                request_number, response_data = item
+                
+                new_users = self.extract_users_from_response(response_data)
+                
+                if new_users:
+                    # Off the event loop so a flush/fsync doesn't stall in-flight requests
+                    await asyncio.to_thread(self.save_users_to_csv, new_users)
+                    print(f"Request #{request_number}: ✓ Found {len(new_users)} new users (Total: {self.total_user_count})")
+                else:
+                    print(f"Request #{request_number}: ✓ No new users found")
+                    stop.set()
+        
+        async with self._async_session(max_clients=concurrency) as session:
+            writer_task = asyncio.create_task(writer())
+            # If the writer fails, stop the workers; awaiting writer_task below re-raises its error
+            writer_task.add_done_callback(lambda _: stop.set())
+            tasks = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await response_queue.put(None)
+                await writer_task
+
+    def print_summary(self):
+        """Print a summary of the scraping session."""
+        print("\n" + "="*60)
+        print("SCRAPING SUMMARY")
+        print("="*60)
+        print(f"Total requests made: {self.request_count}")
+        print(f"Total unique users collected: {self.total_user_count}")
+        print(f"CSV file saved at: {self.csv_filename}")
+        
+        if self.recent_users:
+            print("\nSample of collected users (most recent):")
+            for i, user in enumerate(self.recent_users):
+                print(f"  {i+1}. {user['name']} (ID: {user['user_id'][:8]}...) - Age: {user['age']} - {user['photo_count']} photos")
+            if self.total_user_count > len(self.recent_users):
+                print(f"  ... and {self.total_user_count - len(self.recent_users)} more users")
 
 def main():
     """Main function to configure and run the scraper."""
@@ -251,23 +641,26 @@ def main():
     INTERESTED_IN_GENDER = 0  # 0 for Men, 1 for Women
     
     # Scraper Settings
-    DELAY_BETWEEN_REQUESTS = 2  # seconds
+    REQUESTS_PER_SECOND = 5.0  # Sustained request rate, adjusted to the API's rate-limit headers
+    BURST = 10  # Requests allowed back-to-back before the rate applies
     MAX_REQUESTS = None  # Set to None for unlimited, or a number for a limit
+    CONCURRENCY = 1  # Number of concurrent recs requests (1 = sequential)
     
     # --- EXECUTION ---
     scraper = TinderScraper(AUTH_TOKEN)
     
     # Update profile settings before scraping
     print("Configuring profile settings...")
-    scraper.update_location(LATITUDE, LONGITUDE)
-    scraper.update_age_filter(MIN_AGE, MAX_AGE)
-    scraper.update_distance_filter(DISTANCE_KM)
-    scraper.update_gender_interest(INTERESTED_IN_GENDER)
+    asyncio.run(scraper.update_profile_settings_async(
+        LATITUDE, LONGITUDE, MIN_AGE, MAX_AGE, DISTANCE_KM, INTERESTED_IN_GENDER
+    ))
     
     # Run the scraping process
     scraper.run_continuous_scraping(
-        delay_between_requests=DELAY_BETWEEN_REQUESTS,
-        max_requests=MAX_REQUESTS
+        rate=REQUESTS_PER_SECOND,
+        burst=BURST,
+        max_requests=MAX_REQUESTS,
+        concurrency=CONCURRENCY
     )
 
 if __name__ == "__main__":